@@ -9,11 +9,18 @@ from flask import jsonify
 from sqlite3 import IntegrityError
 from datetime import timedelta, date, datetime
 from functools import wraps
+from collections import Counter
 from proj2.pdf_receipt import generate_order_receipt_pdf
 from proj2.menu_generation import MenuGenerator
 from werkzeug.security import check_password_hash, generate_password_hash
 from flask import Flask, render_template, url_for, redirect, request, session, send_file, abort
 
+# orjson is optional; _loads_json falls back to the stdlib parser without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Use ONLY these helpers for DB access
 from proj2.sqlQueries import (
     create_connection,
@@ -30,6 +37,9 @@ db_file = os.path.join(os.path.dirname(__file__), "CSC510_DB.db")
 
 # ---------------------- Helpers ----------------------
 
+# Order details decoder for hot loops over many orders
+_loads_json = orjson.loads if orjson is not None else json.loads
+
 
 def _money(x: float) -> float:
     """
@@ -104,74 +114,69 @@ def record_analytics_snapshot(rtr_id):
         return False
 
     try:
-        # Get all orders for this restaurant
-        orders = fetch_all(
+        # Order counts come straight from SQL; only rows with non-empty details are streamed
+        # back for parsing. With no orders the totals below stay at zero and the snapshot is blank
+        counts = fetch_one(
             conn,
             """
-            SELECT ord_id, status, details
+            SELECT COUNT(*), COUNT(CASE WHEN lower(status) IN ('completed', 'delivered') THEN 1 END)
             FROM "Order"
             WHERE rtr_id = ?
             """,
             (rtr_id,),
         )
+        total_orders, completed_orders = counts if counts else (0, 0)
 
-        if not orders:
-            # No orders yet, create a blank snapshot
-            total_orders = 0
-            total_revenue_cents = 0
-            avg_order_value_cents = 0
-            total_customers = 0
-            order_completion_rate = 0.0
-            most_popular_item_id = None
-        else:
-            total_orders = len(orders)
-            total_revenue_cents = 0
-            unique_customers = set()
-            completed_orders = 0
-            item_counts = {}
-
-            # Process each order
-            for ord_id, status, details_json in orders:
-                # Track completion rate
-                if status and status.lower() in ["completed", "delivered"]:
-                    completed_orders += 1
-
-                # Parse details JSON
+        # Pull out just the charge total and items array; json_valid skips malformed details
+        # and items that aren't a JSON array come back as NULL
+        orders = execute_query(
+            conn,
+            """
+            SELECT json_extract(details, '$.charges.total'),
+                   CASE WHEN json_type(details, '$.items') = 'array'
+                        THEN json_extract(details, '$.items') END
+            FROM "Order"
+            WHERE rtr_id = ? AND details != '{}' AND json_valid(details)
+            """,
+            (rtr_id,),
+        )
+
+        total_revenue_cents = 0
+        item_counts = Counter()
+
+        # Process each order's details
+        for charge_total, items_json in orders or ():
+            # Extract revenue; a non-numeric total is ignored
+            if isinstance(charge_total, (int, float)):
+                total_cents = int(charge_total * 100)
+                total_revenue_cents += total_cents
+
+            # Track items for popularity; SQLite only returns validated arrays here
+            if items_json is not None:
                 try:
-                    if details_json:
-                        details = (
-                            json.loads(details_json)
-                            if isinstance(details_json, str)
-                            else details_json
-                        )
-
-                        # Extract revenue
-                        if "charges" in details and "total" in details["charges"]:
-                            total_cents = int(details["charges"]["total"] * 100)
-                            total_revenue_cents += total_cents
-
-                        # Track items for popularity
-                        if "items" in details:
-                            for item in details["items"]:
-                                itm_id = item.get("itm_id")
-                                if itm_id:
-                                    item_counts[itm_id] = item_counts.get(itm_id, 0) + 1
-                except (json.JSONDecodeError, TypeError, KeyError):
+                    # Plain subscripts rather than a bound .get() call per item
+                    item_counts.update(
+                        item["itm_id"]
+                        for item in _loads_json(items_json)
+                        if "itm_id" in item and item["itm_id"]
+                    )
+                except TypeError:
+                    # An item that is not an object
                     continue
 
-                # Note: We don't have usr_id in the Order table currently
-                # So we can't track unique_customers reliably
-                # This would need to be added to the Order schema if needed
+            # Note: We don't have usr_id in the Order table currently
+            # So we can't track unique_customers reliably
+            # This would need to be added to the Order schema if needed
 
-            # Calculate metrics
-            avg_order_value_cents = total_revenue_cents // total_orders if total_orders > 0 else 0
-            total_customers = total_orders  # Use total orders as proxy since usr_id not available
-            order_completion_rate = (completed_orders / total_orders) if total_orders > 0 else 0.0
+        # Calculate metrics
+        avg_order_value_cents = total_revenue_cents // total_orders if total_orders > 0 else 0
+        total_customers = total_orders  # Use total orders as proxy since usr_id not available
+        order_completion_rate = (completed_orders / total_orders) if total_orders > 0 else 0.0
 
-            # Find most popular item
-            most_popular_item_id = None
-            if item_counts:
-                most_popular_item_id = max(item_counts.items(), key=lambda x: x[1])[0]
+        # Find most popular item
+        most_popular_item_id = None
+        if item_counts:
+            most_popular_item_id = item_counts.most_common(1)[0][0]
 
         # Record the snapshot
         snapshot_date = date.today().isoformat()
@@ -874,20 +879,58 @@ def restaurant_analytics():
 
     conn = create_connection(db_file)
     try:
-        # Get the latest snapshot for current metrics
-        latest_snapshot = fetch_one(
+        # Dashboard metadata in one round trip: the latest snapshot, the order status
+        # distribution and the last 30 snapshots, tagged by kind and ordered within each
+        metadata = fetch_all(
             conn,
             """
-            SELECT total_orders, total_revenue_cents, avg_order_value_cents, 
-                   order_completion_rate
-            FROM Analytics
-            WHERE rtr_id = ?
-            ORDER BY analytics_id DESC
-            LIMIT 1
+            WITH latest AS (
+                SELECT total_orders, total_revenue_cents, avg_order_value_cents,
+                       order_completion_rate
+                FROM Analytics
+                WHERE rtr_id = :rtr_id
+                ORDER BY analytics_id DESC
+                LIMIT 1
+            ),
+            status AS (
+                SELECT status, COUNT(*) AS count
+                FROM "Order"
+                WHERE rtr_id = :rtr_id
+                GROUP BY status
+            ),
+            history AS (
+                SELECT analytics_id, snapshot_date, total_orders
+                FROM Analytics
+                WHERE rtr_id = :rtr_id
+                ORDER BY snapshot_date DESC, analytics_id DESC
+                LIMIT 30
+            )
+            SELECT 'latest' AS kind, 0 AS seq, total_orders, total_revenue_cents,
+                   avg_order_value_cents, order_completion_rate
+            FROM latest
+            UNION ALL
+            SELECT 'status', ROW_NUMBER() OVER (ORDER BY count DESC, status), status, count, NULL, NULL
+            FROM status
+            UNION ALL
+            SELECT 'history', ROW_NUMBER() OVER (ORDER BY snapshot_date, analytics_id), snapshot_date,
+                   total_orders, NULL, NULL
+            FROM history
+            ORDER BY kind, seq
             """,
-            (rtr_id,),
+            {"rtr_id": rtr_id},
         )
 
+        latest_snapshot = None
+        status_data = []
+        snapshots = []  # oldest to newest
+        for kind, _seq, *values in metadata:
+            if kind == "latest":
+                latest_snapshot = values
+            elif kind == "status":
+                status_data.append(values[:2])
+            else:
+                snapshots.append(values[:2])
+
         if latest_snapshot:
             total_orders, total_revenue_cents, avg_order_value_cents, completion_rate = (
                 latest_snapshot
@@ -900,69 +943,34 @@ def restaurant_analytics():
             avg_order_value = 0.0
             completion_rate = 0.0
 
-        # Get order status distribution from actual orders
-        status_data = fetch_all(
-            conn,
-            """
-            SELECT status, COUNT(*) as count
-            FROM "Order"
-            WHERE rtr_id = ?
-            GROUP BY status
-            ORDER BY count DESC
-            """,
-            (rtr_id,),
-        )
-
         status_labels = [s[0] for s in status_data] if status_data else []
         status_counts = [s[1] for s in status_data] if status_data else []
 
-        # Get top menu items from order details JSON
-        # Since items are in JSON, we'll parse them and count
-        orders = fetch_all(
+        # Get top menu items from order details JSON, aggregated by SQLite's json_each.
+        # Malformed details are skipped (json_each on NULL yields no rows); ties keep
+        # first-seen order, numbering item lines by (ord_id, position in items)
+        top_items = fetch_all(
             conn,
             """
-            SELECT details FROM "Order"
-            WHERE rtr_id = ?
+            WITH lines AS (
+                SELECT COALESCE(json_extract(je.value, '$.name'), 'Unknown') AS item_name,
+                       COALESCE(json_extract(je.value, '$.qty'), 1) AS qty,
+                       ROW_NUMBER() OVER (ORDER BY o.ord_id, je.key) AS seq
+                FROM "Order" o,
+                     json_each(CASE WHEN json_valid(o.details) THEN o.details END, '$.items') je
+                WHERE o.rtr_id = ? AND je.type = 'object'
+            )
+            SELECT item_name, SUM(qty) AS units
+            FROM lines
+            GROUP BY item_name
+            ORDER BY units DESC, MIN(seq)
+            LIMIT 10
             """,
             (rtr_id,),
         )
-
-        item_frequency = {}
-        for order_row in orders:
-            if order_row[0]:
-                try:
-                    details = (
-                        json.loads(order_row[0]) if isinstance(order_row[0], str) else order_row[0]
-                    )
-                    if "items" in details:
-                        for item in details["items"]:
-                            item_name = item.get("name", "Unknown")
-                            item_frequency[item_name] = item_frequency.get(item_name, 0) + item.get(
-                                "qty", 1
-                            )
-                except (json.JSONDecodeError, TypeError, KeyError):
-                    continue
-
-        # Sort by frequency and get top 10
-        top_items = sorted(item_frequency.items(), key=lambda x: x[1], reverse=True)[:10]
         item_names = [item[0] for item in top_items]
         item_counts = [item[1] for item in top_items]
 
-        # Get historical data for time series chart (last 30 days)
-        snapshots = fetch_all(
-            conn,
-            """
-            SELECT snapshot_date, total_orders
-            FROM Analytics
-            WHERE rtr_id = ?
-            ORDER BY snapshot_date DESC
-            LIMIT 30
-            """,
-            (rtr_id,),
-        )
-
-        # Reverse to show oldest to newest
-        snapshots = list(reversed(snapshots))
         date_labels = [s[0] for s in snapshots]
         date_counts = [s[1] for s in snapshots]
 
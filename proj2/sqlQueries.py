@@ -1,9 +1,15 @@
 import sqlite3
 
+# Compiled statements kept per connection (sqlite3 default is 128). The cache is keyed on
+# the exact SQL text, so queries passed to the helpers below should be constant strings
+# with values bound through params, never interpolated into the SQL.
+STATEMENT_CACHE_SIZE = 256
+
 
 def create_connection(db_file: str):
     """
     Create and return a connection to the specified SQLite database.
+    The connection caches up to STATEMENT_CACHE_SIZE prepared statements.
     Args:
         db_file (str): Path to the SQLite database file.
     Returns:
@@ -11,7 +17,7 @@ def create_connection(db_file: str):
     """
     conn = None
     try:
-        conn = sqlite3.connect(db_file)
+        conn = sqlite3.connect(db_file, cached_statements=STATEMENT_CACHE_SIZE)
     except sqlite3.Error as e:
         print(e)
     return conn
@@ -29,9 +35,35 @@ def close_connection(conn):
         conn.close()
 
 
+def tune_connection(conn, wal=False):
+    """
+    Apply write-throughput PRAGMAs to a connection used by the seed and maintenance scripts.
+    Sets synchronous=NORMAL, waits up to 5s on a locked database instead of failing, keeps
+    temp structures in memory, and enlarges the page cache and mmap window.
+    WAL is opt-in because journal_mode is stored in the database file: enabling it
+    permanently converts that file, so leave it off for the app's tracked database.
+    Args:
+        conn (sqlite3.Connection): Active database connection.
+        wal (bool, optional): Switch the database to WAL journaling (fsync on checkpoint
+            rather than every commit).
+    Returns:
+        None
+    """
+    if conn:
+        if wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA mmap_size=268435456")
+
+
 def execute_query(conn, query: str, params=()):
     """
     Execute a single SQL query with optional parameters.
+    Keep the query text constant and bind values through params so repeated calls
+    reuse the connection's cached prepared statement.
     Args:
         conn (sqlite3.Connection): Active database connection.
         query (str): SQL query string to execute.
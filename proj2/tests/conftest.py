@@ -362,6 +362,41 @@ def seed_orders_for_analytics(temp_db_path, seed_minimal_data):
     return seed_minimal_data
 
 
+@pytest.fixture()
+def isolated_restaurant(temp_db_path, seed_minimal_data):
+    """Create a restaurant of its own so other tests' orders stay out of its numbers.
+
+    Yields its rtr_id, then deletes it along with its orders and analytics snapshots.
+    """
+    conn = create_connection(temp_db_path)
+    try:
+        execute_query(
+            conn,
+            """
+          INSERT INTO "Restaurant"(name, email, password_HS, address, city, state, zip, status)
+          VALUES ("Isolated Restaurant", "isolated@test.com", "x", "1 Elm", "Raleigh", "NC", "27606", "open")
+        """,
+        )
+        rtr_id = expect_one(
+            fetch_one(conn, "SELECT rtr_id FROM Restaurant WHERE email=?", ("isolated@test.com",)),
+            "Expected the isolated restaurant after insert",
+        )
+        yield rtr_id
+    finally:
+        execute_query(
+            conn,
+            'DELETE FROM "Order" WHERE rtr_id IN (SELECT rtr_id FROM Restaurant WHERE email=?)',
+            ("isolated@test.com",),
+        )
+        execute_query(
+            conn,
+            "DELETE FROM Analytics WHERE rtr_id IN (SELECT rtr_id FROM Restaurant WHERE email=?)",
+            ("isolated@test.com",),
+        )
+        execute_query(conn, "DELETE FROM Restaurant WHERE email=?", ("isolated@test.com",))
+        close_connection(conn)
+
+
 @pytest.fixture(autouse=True)
 def monkeypatch_pdf(monkeypatch):
     """Avoid calling real PDF generator; return dummy bytes."""
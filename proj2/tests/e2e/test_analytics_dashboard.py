@@ -9,6 +9,8 @@ Tests cover:
 - Navigation between dashboard and analytics
 """
 
+import json
+
 import pytest
 from proj2.sqlQueries import create_connection, close_connection, execute_query, fetch_one
 
@@ -181,6 +183,41 @@ def test_analytics_popular_items(client, restaurant_login_session, seed_orders_f
     assert "Top 10" in content or "Menu Items" in content or "itemsChart" in content
 
 
+def test_analytics_popular_items_sums_quantities(
+    client, temp_db_path, seed_minimal_data, isolated_restaurant
+):
+    """Top items should sum qty across orders and skip orders with malformed details."""
+    rtr_id = isolated_restaurant
+    orders = [
+        json.dumps({"items": [{"name": "Pho", "qty": 2}, {"name": "Banh Mi"}]}),
+        json.dumps({"items": [{"name": "Banh Mi", "qty": 3}]}),
+        "{not valid json",
+    ]
+    conn = create_connection(temp_db_path)
+    try:
+        for details in orders:
+            execute_query(
+                conn,
+                'INSERT INTO "Order" (rtr_id, usr_id, details, status) VALUES (?, ?, ?, ?)',
+                (rtr_id, seed_minimal_data["usr_id"], details, "Delivered"),
+            )
+    finally:
+        close_connection(conn)
+
+    with client.session_transaction() as sess:
+        sess["restaurant_mode"] = True
+        sess["rtr_id"] = rtr_id
+        sess["RestaurantName"] = "Isolated Restaurant"
+
+    resp = client.get("/restaurant/analytics")
+    assert resp.status_code == 200
+    content = resp.data.decode("utf-8")
+
+    # Banh Mi: 1 (default qty) + 3 = 4, ahead of Pho: 2
+    assert 'labels: ["Banh Mi", "Pho"]' in content
+    assert "data: [4, 2]" in content
+
+
 def test_analytics_time_series_data(client, restaurant_login_session, seed_orders_for_analytics):
     """Analytics should show orders over time."""
     resp = client.get("/restaurant/analytics")
@@ -2,7 +2,15 @@
 Tests for Analytics data recording and snapshots
 """
 
-from proj2.sqlQueries import create_connection, close_connection, fetch_one, fetch_all
+import json
+
+from proj2.sqlQueries import (
+    create_connection,
+    close_connection,
+    execute_query,
+    fetch_one,
+    fetch_all,
+)
 
 
 def test_record_analytics_snapshot_creates_record(client, seed_orders_for_analytics):
@@ -139,3 +147,36 @@ def test_analytics_snapshot_completion_rate(client, seed_orders_for_analytics):
         assert 0 <= completion_rate <= 1, "Completion rate should be between 0 and 1"
     finally:
         close_connection(conn)
+
+
+def test_analytics_snapshot_ignores_non_array_items(
+    client, temp_db_path, seed_minimal_data, isolated_restaurant
+):
+    """Orders whose items aren't a JSON array still count, but add no popular items."""
+    from proj2.Flask_app import record_analytics_snapshot
+
+    rtr_id = isolated_restaurant
+    orders = [
+        json.dumps({"items": "[x", "charges": {"total": 10.0}}),
+        json.dumps({"items": [{"itm_id": 7, "qty": 1}], "charges": {"total": 5.5}}),
+    ]
+    conn = create_connection(temp_db_path)
+    try:
+        for details in orders:
+            execute_query(
+                conn,
+                'INSERT INTO "Order" (rtr_id, usr_id, details, status) VALUES (?, ?, ?, ?)',
+                (rtr_id, seed_minimal_data["usr_id"], details, "Delivered"),
+            )
+
+        assert record_analytics_snapshot(rtr_id), "Snapshot recording should succeed"
+
+        snapshot = fetch_one(
+            conn,
+            """SELECT total_orders, total_revenue_cents, most_popular_item_id
+               FROM Analytics WHERE rtr_id = ? ORDER BY analytics_id DESC LIMIT 1""",
+            (rtr_id,),
+        )
+        assert snapshot == (2, 1550, 7)
+    finally:
+        close_connection(conn)
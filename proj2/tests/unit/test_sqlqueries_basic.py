@@ -5,6 +5,7 @@ from proj2.sqlQueries import (
     execute_query,
     fetch_one,
     fetch_all,
+    tune_connection,
 )
 
 
@@ -30,3 +31,27 @@ def test_sql_execute_and_fetch(tmp_path):
         assert row1 == ("y",)
     finally:
         close_connection(con)
+
+
+def test_tune_connection_enables_wal(tmp_path):
+    dbp = tmp_path / "tuned.sqlite"
+    con = create_connection(dbp.as_posix())
+    try:
+        tune_connection(con, wal=True)
+        assert fetch_one(con, "PRAGMA journal_mode") == ("wal",)
+        assert fetch_one(con, "PRAGMA synchronous") == (1,)
+        assert fetch_one(con, "PRAGMA busy_timeout") == (5000,)
+        assert fetch_one(con, "PRAGMA cache_size") == (-65536,)
+    finally:
+        close_connection(con)
+
+
+def test_tune_connection_keeps_journal_mode_by_default(tmp_path):
+    dbp = tmp_path / "tuned.sqlite"
+    con = create_connection(dbp.as_posix())
+    try:
+        tune_connection(con)
+        assert fetch_one(con, "PRAGMA journal_mode") == ("delete",)
+        assert fetch_one(con, "PRAGMA synchronous") == (1,)
+    finally:
+        close_connection(con)
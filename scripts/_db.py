@@ -0,0 +1,26 @@
+"""Shared database connection for the maintenance scripts."""
+
+import atexit
+import os
+import sys
+
+sys.path.insert(0, '.')
+from proj2.sqlQueries import create_connection, close_connection, tune_connection
+
+db_file = os.path.join('proj2', 'CSC510_DB.db')
+
+_conn = None
+
+
+def get_conn():
+    """Return the process-wide connection, opening and tuning it on first use.
+
+    The connection is closed at interpreter exit, so callers should not close it.
+    """
+    global _conn
+    if _conn is None:
+        _conn = create_connection(db_file)
+        if _conn is not None:
+            tune_connection(_conn)
+            atexit.register(close_connection, _conn)
+    return _conn
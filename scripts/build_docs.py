@@ -1,42 +1,45 @@
 # scripts/build_docs.py
-import pathlib, html, sys
-from markdown import markdown
+import os, pathlib, html, sys
+from markdown import Markdown
 
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 SITE = ROOT / "proj2" / "site"
 DOCS_SRC = ROOT / "proj2" / "docs"
 DOCS_OUT = SITE / "docs"
 
-def wrap_html(title, body, rel_css):
-    return f"""<!doctype html>
+_TEMPLATE = """<!doctype html>
 <html lang="en"><head>
 <meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{html.escape(title)}</title>
+<title>{title}</title>
 <link rel="stylesheet" href="{rel_css}">
 </head><body class="pdoc"><main class="pdoc">
 <article>{body}</article>
 <p><a href="../proj2.html">← Back to API Reference</a></p>
 </main></body></html>"""
 
+def wrap_html(title, body, rel_css):
+    return _TEMPLATE.format(title=html.escape(title), body=body, rel_css=rel_css)
+
 def build_markdown_pages():
     try:
         DOCS_OUT.mkdir(parents=True, exist_ok=True)
-        md_files = list(DOCS_SRC.glob("*.md"))
+        with os.scandir(DOCS_SRC) as entries:
+            md_files = [e for e in entries if e.is_file() and e.name.endswith(".md")]
         if not md_files:
             print(f"⚠️  No markdown files found in {DOCS_SRC}")
             return
         
+        converter = Markdown(extensions=["tables","fenced_code"])
         for md in md_files:
-            try:
-                title = md.stem.replace("-", " ").title()
-                body = markdown(md.read_text(encoding="utf-8"), extensions=["tables","fenced_code"])
-                (DOCS_OUT / f"{md.stem}.html").write_text(
-                    wrap_html(title, body, "../assets/custom.css"), encoding="utf-8"
-                )
-                print(f"✓ Generated: {md.stem}.html")
-            except Exception as e:
-                print(f"❌ Error processing {md.name}: {e}", file=sys.stderr)
-                raise
+            stem = md.name[:-3]
+            title = stem.replace("-", " ").title()
+            with open(md.path, "rb") as fh:
+                text = fh.read().decode("utf-8")
+            body = converter.reset().convert(text)
+            (DOCS_OUT / f"{stem}.html").write_bytes(
+                wrap_html(title, body, "../assets/custom.css").encode("utf-8")
+            )
+            print(f"✓ Generated: {stem}.html")
     except Exception as e:
         print(f"❌ Error building markdown pages: {e}", file=sys.stderr)
         raise
@@ -1,6 +1,9 @@
 import sqlite3
 import sys
 import os
+from pathlib import Path
+from contextlib import closing
+from itertools import groupby
 
 db_file = os.path.join('proj2', 'CSC510_DB.db')
 
@@ -11,29 +14,29 @@ def check_database_tables():
         print(f"Database file not found: {db_file}")
         sys.exit(1)
 
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
-
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+    # Open read-only and get every table's columns in one pass;
+    # closing() guarantees the close on error
+    uri = f"{Path(db_file).resolve().as_uri()}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        conn.execute("PRAGMA mmap_size=268435456")
+        rows = conn.execute("""
+            SELECT m.name AS tbl, p.name AS col, p.type
+            FROM sqlite_master m JOIN pragma_table_info(m.name) p
+            WHERE m.type = 'table'
+            ORDER BY m.name, p.cid
+        """).fetchall()
+    schemas = [(table_name, [(col, col_type) for _, col, col_type in group])
+               for table_name, group in groupby(rows, key=lambda r: r[0])]
 
     print("Tables in database:")
-    for table in tables:
-        print(f"  - {table[0]}")
+    for table_name, _ in schemas:
+        print(f"  - {table_name}")
 
-    # Get schema for each table
     print("\nTable schemas:")
-    for table in tables:
-        table_name = table[0]
-        # Quote table name in case it's a reserved word
-        cursor.execute(f'PRAGMA table_info("{table_name}");')
-        columns = cursor.fetchall()
+    for table_name, columns in schemas:
         print(f"\n{table_name}:")
-        for col in columns:
-            print(f"  - {col[1]}: {col[2]}")
-
-    conn.close()
+        for col, col_type in columns:
+            print(f"  - {col}: {col_type}")
 
 
 if __name__ == '__main__':
@@ -1,10 +1,13 @@
 import sqlite3
 import os
+from pathlib import Path
 
 
 def get_counts(db_path):
     """Get record counts for all tables in a database."""
-    conn = sqlite3.connect(db_path)
+    # Open read-only; counting rows never needs write access
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute("PRAGMA mmap_size=268435456")
     c = conn.cursor()
     tables = ['User', 'Restaurant', 'MenuItem', '"Order"', 'OrderItems', 'Review', 'Analytics']
     counts = {}
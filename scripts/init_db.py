@@ -35,11 +35,6 @@ CREATE TABLE IF NOT EXISTS "OrderItems" (
   o_id INTEGER, itm_id INTEGER, quantity INTEGER, unit_price_cents INTEGER
 );
 
-CREATE TABLE IF NOT EXISTS "Orders" (
-  o_id INTEGER PRIMARY KEY AUTOINCREMENT,
-  rtr_id INTEGER, usr_id INTEGER, order_date TEXT, total_amount_cents INTEGER, status TEXT
-);
-
 CREATE TABLE IF NOT EXISTS "Review" (
   rev_id INTEGER PRIMARY KEY AUTOINCREMENT,
   rtr_id INTEGER, usr_id INTEGER, title TEXT, rating INTEGER, description TEXT
@@ -59,6 +54,18 @@ CREATE TABLE IF NOT EXISTS "Analytics" (
   FOREIGN KEY(rtr_id) REFERENCES Restaurant(rtr_id),
   FOREIGN KEY(most_popular_item_id) REFERENCES MenuItem(itm_id)
 );
+
+-- Top-items report: MenuItem by restaurant, then OrderItems by item. itm_id/ord_id are
+-- rowids, so the single-column MenuItem index already covers (rtr_id, itm_id) and the
+-- join to "Order" goes through its primary key
+CREATE INDEX IF NOT EXISTS ix_menuitem_rtr ON "MenuItem"(rtr_id);
+CREATE INDEX IF NOT EXISTS ix_oi_itm ON "OrderItems"(itm_id, o_id);
+
+-- Restaurant lookups by name in the seed and credential scripts
+CREATE INDEX IF NOT EXISTS ix_restaurant_name ON "Restaurant"(name);
+
+-- Latest-snapshot lookups (WHERE rtr_id = ? ORDER BY analytics_id DESC LIMIT 1)
+CREATE INDEX IF NOT EXISTS ix_analytics_rtr_desc ON "Analytics"(rtr_id, analytics_id DESC);
 """
 
 def init_database():
@@ -12,7 +12,6 @@ This script will:
 """
 
 import os
-import shutil
 import sqlite3
 from datetime import datetime
 
@@ -37,6 +36,11 @@ CREATE TABLE IF NOT EXISTS "Analytics" (
 );
 """
 
+# Serves the dashboard's latest-snapshot lookup per restaurant
+ANALYTICS_INDEX = """
+CREATE INDEX IF NOT EXISTS ix_analytics_rtr_desc ON "Analytics"(rtr_id, analytics_id DESC)
+"""
+
 def main():
     if not os.path.exists(db_file):
         print(f"❌ Database file not found: {db_file}")
@@ -45,7 +49,14 @@ def main():
     # Create backup
     backup_file = f"{db_file}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
     try:
-        shutil.copy2(db_file, backup_file)
+        # Use SQLite's online backup so the snapshot is consistent even with a live journal/WAL
+        src = sqlite3.connect(db_file)
+        dst = sqlite3.connect(backup_file)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
         print(f"✓ Backup created: {backup_file}")
     except Exception as e:
         print(f"❌ Failed to create backup: {e}")
@@ -65,6 +76,10 @@ def main():
             conn.commit()
             print("✓ Analytics table created successfully")
         
+        cursor.execute(ANALYTICS_INDEX)
+        conn.commit()
+        print("✓ Analytics (rtr_id, analytics_id DESC) index in place")
+        
         # Verify table structure
         cursor.execute("PRAGMA table_info(Analytics)")
         columns = cursor.fetchall()
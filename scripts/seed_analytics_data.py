@@ -20,12 +20,62 @@ import random
 import sys
 import json
 
+# numpy and orjson are optional; fall back to the stdlib when they aren't installed
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Database file
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from proj2.sqlQueries import create_connection, close_connection, fetch_all, fetch_one, execute_query
 
 db_file = os.path.join(os.path.dirname(__file__), '..', 'proj2', 'CSC510_DB.db')
 
+# SQLite's JSON1 functions assemble the details object; only the items array is
+# serialized in Python
+INSERT_ORDER_SQL = '''
+    INSERT INTO "Order" (rtr_id, usr_id, details, status)
+    VALUES (?, ?, json_object(
+        'placed_at', ?,
+        'restaurant_id', ?,
+        'items', json(?),
+        'charges', json_object(
+            'subtotal', ?, 'tax', ?, 'delivery_fee', ?,
+            'service_fee', ?, 'tip', ?, 'total', ?
+        ),
+        'delivery_type', ?,
+        'eta_minutes', ?
+    ), ?)
+'''
+
+def dump_json(value):
+    """Serialize a value to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'))
+
+def sample_stage(rng, count, item_count, offset_range):
+    """Draw each order's item indices (1-4 distinct items) and minute offset for a stage.
+
+    Uses numpy's generator when available (rng is None without numpy), else stdlib random.
+    """
+    lo, hi = offset_range
+    if rng is not None:
+        num_items_arr = np.minimum(rng.integers(1, 5, size=count), item_count)
+        selections = [rng.choice(item_count, size=k, replace=False).tolist() for k in num_items_arr]
+        offsets = rng.integers(lo, hi + 1, size=count).tolist()
+    else:
+        selections = [random.sample(range(item_count), min(random.randint(1, 4), item_count))
+                      for _ in range(count)]
+        offsets = [random.randint(lo, hi) for _ in range(count)]
+    return selections, offsets
+
 def seed_analytics_data():
     """
     Seed Order table with realistic dummy data for analytics testing.
@@ -44,6 +94,9 @@ def seed_analytics_data():
         print("❌ Failed to connect to database")
         return False
     
+    # Manage transactions explicitly so the whole insert batch commits once
+    conn.isolation_level = None
+    
     try:
         # Clear existing orders first
         print("🗑️  Clearing existing orders...")
@@ -84,43 +137,51 @@ def seed_analytics_data():
                 "name": "PENDING",
                 "status": "Ordered",
                 "count": 8,
-                "time_offset_minutes": lambda: random.randint(0, 60)  # Today
+                "offset_range": (0, 60)  # Today
             },
             {
                 "name": "CONFIRMED",
                 "status": "Confirmed",
                 "count": 6,
-                "time_offset_minutes": lambda: random.randint(1440, 2880)  # 1-2 days ago
+                "offset_range": (1440, 2880)  # 1-2 days ago
             },
             {
                 "name": "PREPARING",
                 "status": "Preparing",
                 "count": 4,
-                "time_offset_minutes": lambda: random.randint(4320, 5760)  # 3-4 days ago
+                "offset_range": (4320, 5760)  # 3-4 days ago
             },
             {
                 "name": "READY",
                 "status": "Ready",
                 "count": 5,
-                "time_offset_minutes": lambda: random.randint(7200, 8640)  # 5-6 days ago
+                "offset_range": (7200, 8640)  # 5-6 days ago
             },
             {
                 "name": "COMPLETED",
                 "status": random.choice(['Completed', 'Delivered']),
                 "count": 80,  # Increased to get more days of data
-                "time_offset_minutes": lambda: random.randint(10080, 43200)  # 7-30 days ago
+                "offset_range": (10080, 43200)  # 7-30 days ago
             },
             {
                 "name": "CANCELLED",
                 "status": "Cancelled",
                 "count": 5,
-                "time_offset_minutes": lambda: random.randint(1440, 43200)  # 1-30 days ago
+                "offset_range": (1440, 43200)  # 1-30 days ago
             }
         ]
         
+        # Hoist per-restaurant invariants and split menu items into parallel columns
+        rtr_id_int = int(rtr_id)
+        item_count = len(items)
+        item_ids, item_names, item_prices = map(list, zip(*items))
+        rng = np.random.default_rng() if np is not None else None
+        now = datetime.now().astimezone()
+        
         orders_created = 0
         
         print("📝 Creating orders by stage:\n")
+        conn.execute("BEGIN IMMEDIATE")
         for stage in stages:
             stage_name = stage["name"]
             status = stage["status"]
@@ -128,32 +189,29 @@ def seed_analytics_data():
             
             print(f"  Creating {count} {stage_name} orders...")
             
-            for _ in range(count):
+            # Draw every order's item selection and time offset for this stage up front
+            selections, offsets = sample_stage(rng, count, item_count, stage["offset_range"])
+            
+            for item_indices, offset_minutes in zip(selections, offsets):
                 # Calculate order time
-                offset_minutes = stage["time_offset_minutes"]()
-                order_date = datetime.now() - timedelta(minutes=offset_minutes)
+                order_date = now - timedelta(minutes=offset_minutes)
                 
                 # Random customer
                 usr_id = random.choice(user_ids)
                 
-                # Random number of items (1-4)
-                num_items = random.randint(1, 4)
-                item_indices = random.sample(range(len(items)), min(num_items, len(items)))
-                selected_items = [items[i] for i in item_indices]
-                
                 # Build order details JSON
                 detail_items = []
                 subtotal = 0.0
-                for itm_id, name, price in selected_items:
+                for i in item_indices:
                     qty = random.randint(1, 3)
-                    price_dollars = price / 100.0  # Assuming price is in cents
+                    price_dollars = item_prices[i] / 100.0  # Assuming price is in cents
                     line_total = qty * price_dollars
                     subtotal += line_total
                     detail_items.append({
-                        "itm_id": itm_id,
-                        "name": name,
+                        "itm_id": item_ids[i],
+                        "name": item_names[i],
                         "qty": qty,
-                        "unit_price": price_dollars,
+                        "unit_price": round(price_dollars, 2),
                         "line_total": round(line_total, 2)
                     })
                 
@@ -164,29 +222,15 @@ def seed_analytics_data():
                 tip = round(random.uniform(0, 10), 2)
                 total = round(subtotal + tax + delivery_fee + service_fee + tip, 2)
                 
-                # Create order details JSON
-                details = {
-                    "placed_at": order_date.astimezone().isoformat(),
-                    "restaurant_id": int(rtr_id),
-                    "items": detail_items,
-                    "charges": {
-                        "subtotal": round(subtotal, 2),
-                        "tax": tax,
-                        "delivery_fee": delivery_fee,
-                        "service_fee": service_fee,
-                        "tip": tip,
-                        "total": total
-                    },
-                    "delivery_type": random.choice(['delivery', 'pickup']),
-                    "eta_minutes": random.randint(20, 60)
-                }
-                
                 # Insert order
                 try:
-                    execute_query(conn, '''
-                        INSERT INTO "Order" (rtr_id, usr_id, details, status)
-                        VALUES (?, ?, ?, ?)
-                    ''', (rtr_id, usr_id, json.dumps(details), status))
+                    conn.execute(INSERT_ORDER_SQL, (
+                        rtr_id, usr_id,
+                        order_date.isoformat(), rtr_id_int, dump_json(detail_items),
+                        round(subtotal, 2), tax, delivery_fee, service_fee, tip, total,
+                        random.choice(['delivery', 'pickup']), random.randint(20, 60),
+                        status
+                    ))
                     orders_created += 1
                 except Exception as e:
                     print(f"      Warning: Could not insert order: {e}")
@@ -194,8 +238,14 @@ def seed_analytics_data():
             
             print(f"    ✓ Created {count} {stage_name} orders")
         
+        conn.execute("COMMIT")
         print(f"\n✓ Created {orders_created} total orders")
         
+        # Index the summary queries' filter/group columns once the bulk load is done,
+        # so index maintenance doesn't slow down the inserts above
+        execute_query(conn, 'CREATE INDEX IF NOT EXISTS ix_order_rtr_status ON "Order"(rtr_id, status)')
+        execute_query(conn, 'ANALYZE "Order"')
+        
         # Display summary
         print("\n📊 Data Summary:")
         order_summary = fetch_one(conn, '''
@@ -7,68 +7,114 @@ import sqlite3
 from datetime import datetime, timedelta
 import json
 import random
+from itertools import repeat
 
 sys.path.insert(0, '.')
-from proj2.sqlQueries import create_connection, close_connection, fetch_one, execute_query
+from proj2.sqlQueries import create_connection, close_connection, fetch_one, execute_query, tune_connection
 from werkzeug.security import generate_password_hash
 
 db_file = os.path.join('proj2', 'CSC510_DB.db')
 
-def seed_menu_items():
+# Throwaway test credentials don't need werkzeug's default work factor; the method is
+# stored in the hash, so check_password_hash verifies it unchanged
+TEST_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+# INSERT ... RETURNING needs SQLite 3.35+
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+INSERT_USER_SQL = '''
+    INSERT INTO User 
+    (first_name, last_name, email, phone, password_HS, wallet, preferences, allergies, generated_menu)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Sample Laotian menu for Bida Manda, stored by column so executemany can zip the rows
+SAMPLE_MENU = {
+    'names': [
+        "Drunken Noodles", "Green Papaya Salad", "Larb", "Sticky Rice",
+        "Pad Thai", "Tom Yum Soup", "Satay Skewers", "Mango Sticky Rice",
+    ],
+    'descriptions': [
+        "Spicy stir-fried noodles with basil",
+        "Fresh green papaya with lime dressing",
+        "Spicy ground meat salad with herbs",
+        "Traditional steamed sticky rice",
+        "Thai stir-fried noodles with shrimp",
+        "Hot and sour soup with coconut",
+        "Grilled meat skewers with peanut sauce",
+        "Sweet dessert with fresh mango",
+    ],
+    'prices': [1600, 1400, 1500, 300, 1550, 1200, 1800, 800],
+    'calories': [450, 250, 380, 200, 420, 280, 380, 350],
+    'allergens': [
+        "Gluten, Soy", "Fish, Peanuts", "Fish", None,
+        "Peanuts, Shellfish", "Shellfish", "Peanuts", None,
+    ],
+}
+
+# Order details shared by every sample order (placed_at and restaurant_id are added per run)
+SAMPLE_ORDER_DETAILS = {
+    'items': [
+        {'itm_id': 1, 'name': 'Drunken Noodles', 'qty': 1, 'unit_price': 16.00, 'line_total': 16.00},
+        {'itm_id': 2, 'name': 'Green Papaya Salad', 'qty': 1, 'unit_price': 14.00, 'line_total': 14.00}
+    ],
+    'charges': {
+        'subtotal': 30.00,
+        'tax': 2.18,
+        'delivery_fee': 2.99,
+        'service_fee': 1.29,
+        'tip': 4.00,
+        'total': 40.46
+    },
+    'delivery_type': 'delivery',
+    'eta_minutes': 35,
+    'notes': 'No peanuts'
+}
+
+def seed_menu_items(conn):
     """Seed Bida Manda with menu items."""
-    conn = create_connection(db_file)
-    if not conn:
-        print("❌ Failed to connect to database")
+    # Get Bida Manda ID
+    rtr = fetch_one(conn, "SELECT rtr_id FROM Restaurant WHERE name = 'Bida Manda'")
+    if not rtr:
+        print("❌ Restaurant Bida Manda not found")
         return False
     
-    try:
-        # Get Bida Manda ID
-        rtr = fetch_one(conn, "SELECT rtr_id FROM Restaurant WHERE name = 'Bida Manda'")
-        if not rtr:
-            print("❌ Restaurant Bida Manda not found")
-            return False
-        
-        rtr_id = rtr[0]
-        print(f"✓ Found Bida Manda (ID: {rtr_id})")
-        
-        # Check if items already exist
+    rtr_id = rtr[0]
+    print(f"✓ Found Bida Manda (ID: {rtr_id})")
+    
+    # Check if items already exist
+    if fetch_one(conn, "SELECT 1 FROM MenuItem WHERE rtr_id = ? LIMIT 1", (rtr_id,)):
         items = fetch_one(conn, "SELECT COUNT(*) FROM MenuItem WHERE rtr_id = ?", (rtr_id,))
-        if items and items[0] > 0:
-            print(f"✓ Menu items already exist ({items[0]} items)")
-            return True
-        
-        # Add sample Laotian menu items
-        menu_items = [
-            (rtr_id, "Drunken Noodles", "Spicy stir-fried noodles with basil", 1600, 450, 1, None, "Gluten, Soy"),
-            (rtr_id, "Green Papaya Salad", "Fresh green papaya with lime dressing", 1400, 250, 1, None, "Fish, Peanuts"),
-            (rtr_id, "Larb", "Spicy ground meat salad with herbs", 1500, 380, 1, None, "Fish"),
-            (rtr_id, "Sticky Rice", "Traditional steamed sticky rice", 300, 200, 1, None, None),
-            (rtr_id, "Pad Thai", "Thai stir-fried noodles with shrimp", 1550, 420, 1, None, "Peanuts, Shellfish"),
-            (rtr_id, "Tom Yum Soup", "Hot and sour soup with coconut", 1200, 280, 1, None, "Shellfish"),
-            (rtr_id, "Satay Skewers", "Grilled meat skewers with peanut sauce", 1800, 380, 1, None, "Peanuts"),
-            (rtr_id, "Mango Sticky Rice", "Sweet dessert with fresh mango", 800, 350, 1, None, None),
-        ]
-        
-        for item in menu_items:
-            execute_query(conn, '''
-                INSERT INTO MenuItem 
-                (rtr_id, name, description, price, calories, instock, restock, allergens)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', item)
-        
-        print(f"✓ Added {len(menu_items)} menu items")
+        print(f"✓ Menu items already exist ({items[0]} items)")
         return True
-        
-    finally:
-        close_connection(conn)
+    
+    # Add sample Laotian menu items, one row per name zipped across the columns
+    item_count = len(SAMPLE_MENU['names'])
+    menu_rows = zip(
+        repeat(rtr_id, item_count),
+        SAMPLE_MENU['names'],
+        SAMPLE_MENU['descriptions'],
+        SAMPLE_MENU['prices'],
+        SAMPLE_MENU['calories'],
+        repeat(1, item_count),     # instock
+        repeat(None, item_count),  # restock
+        SAMPLE_MENU['allergens'],
+    )
+    
+    # One transaction for the whole batch (execute_query would commit per row)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany('''
+            INSERT INTO MenuItem 
+            (rtr_id, name, description, price, calories, instock, restock, allergens)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', menu_rows)
+    
+    print(f"✓ Added {item_count} menu items")
+    return True
 
-def seed_orders_and_analytics():
+def seed_orders_and_analytics(conn):
     """Seed orders for analytics dashboard."""
-    conn = create_connection(db_file)
-    if not conn:
-        print("❌ Failed to connect to database")
-        return False
-    
     try:
         # Get restaurant
         rtr = fetch_one(conn, "SELECT rtr_id FROM Restaurant WHERE name = 'Bida Manda'")
@@ -81,32 +127,25 @@ def seed_orders_and_analytics():
         # Create a test user if it doesn't exist
         user = fetch_one(conn, "SELECT usr_id FROM User LIMIT 1")
         if not user:
-            hashed_pw = generate_password_hash("password")
-            execute_query(conn, '''
-                INSERT INTO User 
-                (first_name, last_name, email, phone, password_HS, wallet, preferences, allergies, generated_menu)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', ('Test', 'Customer', 'test@example.com', '555-0001', hashed_pw, 10000, '', '', ''))
-            user = fetch_one(conn, "SELECT usr_id FROM User WHERE email = 'test@example.com'")
+            hashed_pw = generate_password_hash("password", method=TEST_HASH_METHOD)
+            params = ('Test', 'Customer', 'test@example.com', '555-0001', hashed_pw, 10000, '', '', '')
+            if HAS_RETURNING:
+                # Get the new id from the INSERT itself instead of a follow-up lookup
+                with conn:
+                    user = conn.execute(INSERT_USER_SQL + ' RETURNING usr_id', params).fetchone()
+            else:
+                execute_query(conn, INSERT_USER_SQL, params)
+                user = fetch_one(conn, "SELECT usr_id FROM User WHERE email = 'test@example.com'")
         
         usr_id = user[0]
         print(f"✓ Using user ID: {usr_id}")
         
-        # Clear existing orders
-        print("🗑️  Clearing existing orders...")
-        execute_query(conn, 'DELETE FROM "Order"')
-        execute_query(conn, 'DELETE FROM OrderItems')
-        execute_query(conn, 'DELETE FROM Orders')
-        execute_query(conn, 'DELETE FROM Analytics')
-        
-        # Get menu items
-        items_result = fetch_one(conn, 'SELECT COUNT(*) FROM MenuItem WHERE rtr_id = ?', (rtr_id,))
-        item_count = items_result[0] if items_result else 0
-        
-        if item_count == 0:
+        # Get menu items (fetch_one commits, so keep it outside the write transaction)
+        if not fetch_one(conn, 'SELECT 1 FROM MenuItem WHERE rtr_id = ? LIMIT 1', (rtr_id,)):
             print("❌ No menu items found")
             return False
         
+        item_count = fetch_one(conn, 'SELECT COUNT(*) FROM MenuItem WHERE rtr_id = ?', (rtr_id,))[0]
         print(f"✓ Found {item_count} menu items")
         
         # Create sample orders with different statuses
@@ -115,6 +154,7 @@ def seed_orders_and_analytics():
         
         print(f"\n📝 Creating {len(statuses)} sample orders...")
         
+        order_rows = []
         for idx, status in enumerate(statuses):
             # Create order with varied timestamps
             order_time = now - timedelta(hours=idx*2)
@@ -122,28 +162,24 @@ def seed_orders_and_analytics():
             details = {
                 'placed_at': order_time.isoformat(),
                 'restaurant_id': rtr_id,
-                'items': [
-                    {'itm_id': 1, 'name': 'Drunken Noodles', 'qty': 1, 'unit_price': 16.00, 'line_total': 16.00},
-                    {'itm_id': 2, 'name': 'Green Papaya Salad', 'qty': 1, 'unit_price': 14.00, 'line_total': 14.00}
-                ],
-                'charges': {
-                    'subtotal': 30.00,
-                    'tax': 2.18,
-                    'delivery_fee': 2.99,
-                    'service_fee': 1.29,
-                    'tip': 4.00,
-                    'total': 40.46
-                },
-                'delivery_type': 'delivery',
-                'eta_minutes': 35,
-                'notes': 'No peanuts'
+                **SAMPLE_ORDER_DETAILS,
             }
-            
-            execute_query(conn, '''
+            order_rows.append((rtr_id, usr_id, json.dumps(details), status))
+        
+        # Clear existing orders and insert the new ones in a single transaction
+        print("🗑️  Clearing existing orders...")
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in ('Order', 'OrderItems', 'Analytics'):
+                if table in tables:
+                    conn.execute(f'DELETE FROM "{table}"')
+            conn.executemany('''
                 INSERT INTO "Order" (rtr_id, usr_id, details, status)
                 VALUES (?, ?, ?, ?)
-            ''', (rtr_id, usr_id, json.dumps(details), status))
-            
+            ''', order_rows)
+        
+        for idx, status in enumerate(statuses):
             print(f"  ✓ Order {idx+1}: {status}")
         
         print(f"\n✅ Successfully seeded {len(statuses)} orders!")
@@ -154,20 +190,27 @@ def seed_orders_and_analytics():
         import traceback
         traceback.print_exc()
         return False
-    finally:
-        close_connection(conn)
 
 if __name__ == '__main__':
     print("🍽️  Seeding Bida Manda restaurant data...\n")
     
-    if not seed_menu_items():
-        print("❌ Failed to seed menu items")
+    conn = create_connection(db_file)
+    if not conn:
+        print("❌ Failed to connect to database")
         sys.exit(1)
+    tune_connection(conn)
     
-    print()
-    
-    if not seed_orders_and_analytics():
-        print("❌ Failed to seed orders")
-        sys.exit(1)
+    try:
+        if not seed_menu_items(conn):
+            print("❌ Failed to seed menu items")
+            sys.exit(1)
+        
+        print()
+        
+        if not seed_orders_and_analytics(conn):
+            print("❌ Failed to seed orders")
+            sys.exit(1)
+    finally:
+        close_connection(conn)
     
     print("\n✅ All data seeded successfully!")
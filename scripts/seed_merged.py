@@ -11,243 +11,233 @@ Avoids duplicates by checking for existing records before inserting.
 
 import sqlite3
 import os
-import shutil
+import sys
+
+sys.path.insert(0, '.')
+from proj2.sqlQueries import STATEMENT_CACHE_SIZE, tune_connection
 
 # Paths
 CURRENT_DB = "proj2/CSC510_DB.db"
 BACKUP_DB = "proj2/CSC510_DB.db.backup.20251119_183208"
 MERGED_DB = "proj2/CSC510_DB_merged.db"
 
+# Natural keys the merge deduplicates on that the app schema doesn't index (User and
+# Restaurant emails are already UNIQUE). The app's data may legitimately repeat these
+# keys, e.g. one review per order, so they are plain indexes that only serve the
+# NOT EXISTS probes, and they exist only for the duration of the merge.
+MERGE_INDEXES = {
+    "ix_merge_menuitem_rtr_name": "MenuItem(rtr_id, name)",
+    "ix_merge_review_usr_rtr": "Review(usr_id, rtr_id)",
+}
+
+# Row-at-a-time insert for merge_orders, which needs lastrowid per order. The table
+# name is filled in once per merge so every row reuses the same prepared statement.
+_INSERT_ORDER_SQL = 'INSERT INTO "{table}" (usr_id, rtr_id, details, status) VALUES (?, ?, ?, ?)'
+
 def copy_database(src, dst):
-    """Copy entire database to avoid modifying original."""
-    shutil.copy2(src, dst)
+    """Copy entire database to avoid modifying original.
+
+    Uses SQLite's online backup so pending WAL frames are included and the copy is consistent.
+    """
+    src_conn = sqlite3.connect(src)
+    dst_conn = sqlite3.connect(dst)
+    try:
+        src_conn.backup(dst_conn)
+    finally:
+        dst_conn.close()
+        src_conn.close()
     print(f"[OK] Copied {src} to {dst}")
 
 def get_connection(db_path):
     """Get database connection."""
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row
     return conn
 
-def merge_users(dst_conn, src_conn):
+def load_id_map(conn, name, id_map):
+    """Load an old->new id mapping into a temp table so merge SQL can join on it."""
+    conn.execute(f'DROP TABLE IF EXISTS temp."{name}"')
+    conn.execute(f'CREATE TEMP TABLE "{name}" (old_id INTEGER PRIMARY KEY, new_id INTEGER)')
+    conn.executemany(f'INSERT INTO temp."{name}" (old_id, new_id) VALUES (?, ?)', id_map.items())
+
+def merge_users(dst_conn):
     """Merge User table - avoid duplicates by email."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    # Get all users from source
-    src_cur.execute("SELECT * FROM User")
-    src_users = src_cur.fetchall()
+    with dst_conn:
+        # Anti-join against existing users, keeping the first backup row per email
+        cur = dst_conn.execute("""
+            INSERT INTO User (first_name, last_name, email, phone, password_HS, wallet, preferences, allergies, generated_menu)
+            SELECT first_name, last_name, email, phone, password_HS, wallet, preferences, allergies, generated_menu
+            FROM (SELECT *, MIN(usr_id) FROM backup.User GROUP BY email) b
+            WHERE NOT EXISTS (SELECT 1 FROM main.User d WHERE d.email = b.email)
+            ORDER BY b.usr_id
+        """)
+        inserted = cur.rowcount
+        skipped = dst_conn.execute("SELECT COUNT(*) FROM backup.User").fetchone()[0] - inserted
     
-    # Get existing emails in destination
-    dst_cur.execute("SELECT email FROM User")
-    existing_emails = {row[0] for row in dst_cur.fetchall()}
-    
-    inserted = 0
-    skipped = 0
-    
-    for user in src_users:
-        if user["email"] not in existing_emails:
-            dst_cur.execute("""
-                INSERT INTO User (first_name, last_name, email, phone, password_HS, wallet, preferences, allergies, generated_menu)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (user["first_name"], user["last_name"], user["email"], user["phone"], 
-                  user["password_HS"], user["wallet"], user["preferences"], user["allergies"], user["generated_menu"]))
-            inserted += 1
-            existing_emails.add(user["email"])
-        else:
-            skipped += 1
-    
-    dst_conn.commit()
     print(f"[OK] Users: inserted {inserted}, skipped {skipped} duplicates")
 
-def merge_restaurants(dst_conn, src_conn):
+def merge_restaurants(dst_conn):
     """Merge Restaurant table - avoid duplicates by email."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    src_cur.execute("SELECT * FROM Restaurant")
-    src_restaurants = src_cur.fetchall()
-    
-    dst_cur.execute("SELECT email FROM Restaurant")
-    existing_emails = {row[0] for row in dst_cur.fetchall()}
+    with dst_conn:
+        dst_cur = dst_conn.cursor()
+    
+        # Anti-join against existing restaurants, keeping the first backup row per email
+        dst_cur.execute("""
+            INSERT INTO Restaurant (name, email, password_HS, address, city, state, zip, status, hours, phone)
+            SELECT name, email, password_HS, address, city, state, zip, status, hours, phone
+            FROM (SELECT *, MIN(rtr_id) FROM backup.Restaurant GROUP BY email) b
+            WHERE NOT EXISTS (SELECT 1 FROM main.Restaurant d WHERE d.email = b.email)
+            ORDER BY b.rtr_id
+        """)
+        inserted = dst_cur.rowcount
+        skipped = dst_conn.execute("SELECT COUNT(*) FROM backup.Restaurant").fetchone()[0] - inserted
+    
+        # Map old rtr_id to new rtr_id by email, covering inserted and pre-existing rows
+        dst_cur.execute("""
+            SELECT b.rtr_id, MIN(d.rtr_id)
+            FROM backup.Restaurant b JOIN main.Restaurant d ON d.email = b.email
+            GROUP BY b.rtr_id
+        """)
+        old_to_new_id = dict(dst_cur.fetchall())
     
-    inserted = 0
-    skipped = 0
-    old_to_new_id = {}  # Map old rtr_id to new rtr_id
-    
-    for restaurant in src_restaurants:
-        if restaurant["email"] not in existing_emails:
-            dst_cur.execute("""
-                INSERT INTO Restaurant (name, email, password_HS, address, city, state, zip, status, hours, phone)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (restaurant["name"], restaurant["email"], restaurant["password_HS"], 
-                  restaurant["address"], restaurant["city"], restaurant["state"], 
-                  restaurant["zip"], restaurant["status"], restaurant["hours"], restaurant["phone"]))
-            new_id = dst_cur.lastrowid
-            old_to_new_id[restaurant["rtr_id"]] = new_id
-            inserted += 1
-            existing_emails.add(restaurant["email"])
-        else:
-            # Get existing rtr_id for this email
-            dst_cur.execute("SELECT rtr_id FROM Restaurant WHERE email = ?", (restaurant["email"],))
-            row = dst_cur.fetchone()
-            if row:
-                old_to_new_id[restaurant["rtr_id"]] = row[0]
-            skipped += 1
-    
-    dst_conn.commit()
     print(f"[OK] Restaurants: inserted {inserted}, skipped {skipped} duplicates")
     return old_to_new_id
 
-def merge_menu_items(dst_conn, src_conn, rtr_id_map):
+def merge_menu_items(dst_conn, rtr_id_map):
     """Merge MenuItem table - avoid duplicates by (rtr_id, name)."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    src_cur.execute("SELECT * FROM MenuItem")
-    src_items = src_cur.fetchall()
-    
-    dst_cur.execute("SELECT rtr_id, name FROM MenuItem")
-    existing_items = {(row[0], row[1]) for row in dst_cur.fetchall()}
-    
-    inserted = 0
-    skipped = 0
-    old_to_new_id = {}
-    
-    for item in src_items:
-        new_rtr_id = rtr_id_map.get(item["rtr_id"], item["rtr_id"])
-        if (new_rtr_id, item["name"]) not in existing_items:
-            dst_cur.execute("""
-                INSERT INTO MenuItem (rtr_id, name, description, price, calories, instock, allergens)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (new_rtr_id, item["name"], item["description"], item["price"], 
-                  item["calories"], item["instock"], item["allergens"]))
-            new_id = dst_cur.lastrowid
-            old_to_new_id[item["itm_id"]] = new_id
-            inserted += 1
-            existing_items.add((new_rtr_id, item["name"]))
-        else:
-            dst_cur.execute("SELECT itm_id FROM MenuItem WHERE rtr_id = ? AND name = ?", 
-                          (new_rtr_id, item["name"]))
-            row = dst_cur.fetchone()
-            if row:
-                old_to_new_id[item["itm_id"]] = row[0]
-            skipped += 1
+    with dst_conn:
+        dst_cur = dst_conn.cursor()
+        load_id_map(dst_conn, "rtr_id_map", rtr_id_map)
+    
+        # Anti-join against existing items, keeping the first backup row per (rtr_id, name)
+        dst_cur.execute("""
+            INSERT INTO MenuItem (rtr_id, name, description, price, calories, instock, allergens)
+            SELECT new_rtr_id, name, description, price, calories, instock, allergens
+            FROM (
+                SELECT COALESCE(m.new_id, i.rtr_id) AS new_rtr_id, i.*, MIN(i.itm_id)
+                FROM backup.MenuItem i LEFT JOIN temp.rtr_id_map m ON m.old_id = i.rtr_id
+                GROUP BY new_rtr_id, i.name
+            ) b
+            WHERE NOT EXISTS (
+                SELECT 1 FROM main.MenuItem d
+                WHERE d.rtr_id = b.new_rtr_id AND d.name = b.name
+            )
+            ORDER BY b.itm_id
+        """)
+        inserted = dst_cur.rowcount
+        skipped = dst_conn.execute("SELECT COUNT(*) FROM backup.MenuItem").fetchone()[0] - inserted
+    
+        # Map old itm_id to new itm_id by (rtr_id, name), covering inserted and pre-existing rows
+        dst_cur.execute("""
+            SELECT i.itm_id, MIN(d.itm_id)
+            FROM backup.MenuItem i
+            LEFT JOIN temp.rtr_id_map m ON m.old_id = i.rtr_id
+            JOIN main.MenuItem d ON d.rtr_id = COALESCE(m.new_id, i.rtr_id) AND d.name = i.name
+            GROUP BY i.itm_id
+        """)
+        old_to_new_id = dict(dst_cur.fetchall())
     
-    dst_conn.commit()
     print(f"[OK] Menu Items: inserted {inserted}, skipped {skipped} duplicates")
     return old_to_new_id
 
 def merge_orders(dst_conn, src_conn, rtr_id_map, usr_id_map):
     """Merge Orders/Order table - avoid duplicates by (usr_id, rtr_id)."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    # Source might be "Order", destination might be "Orders"
-    src_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('Order', 'Orders')")
-    src_tables = [row[0] for row in src_cur.fetchall()]
-    src_table = 'Order' if 'Order' in src_tables else 'Orders'
-    
-    # Check which table exists in destination
-    dst_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('Order', 'Orders')")
-    dst_tables = [row[0] for row in dst_cur.fetchall()]
-    dst_table = 'Orders' if 'Orders' in dst_tables else 'Order'
-    
-    if src_table not in src_tables or dst_table not in dst_tables:
-        print("[WARN] No Order/Orders table in source or destination!")
-        return {}
-    
-    src_cur.execute(f"SELECT * FROM \"{src_table}\"")
-    src_orders = src_cur.fetchall()
-    
-    # Get existing orders
-    dst_cur.execute(f"SELECT usr_id, rtr_id FROM \"{dst_table}\"")
-    existing_orders = {(row[0], row[1]) for row in dst_cur.fetchall()}
-    
-    inserted = 0
-    skipped = 0
-    old_to_new_id = {}
-    
-    for order in src_orders:
-        new_usr_id = usr_id_map.get(order["usr_id"], order["usr_id"])
-        new_rtr_id = rtr_id_map.get(order["rtr_id"], order["rtr_id"])
+    with dst_conn:
+        src_cur = src_conn.cursor()
+        dst_cur = dst_conn.cursor()
+    
+        # Source might be "Order", destination might be "Orders"
+        src_tables = [row[0] for row in src_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('Order', 'Orders')")]
+        src_table = 'Order' if 'Order' in src_tables else 'Orders'
+    
+        # Check which table exists in destination
+        dst_tables = [row[0] for row in dst_cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('Order', 'Orders')")]
+        dst_table = 'Orders' if 'Orders' in dst_tables else 'Order'
+    
+        if src_table not in src_tables or dst_table not in dst_tables:
+            print("[WARN] No Order/Orders table in source or destination!")
+            return {}
+    
+        # Get existing orders
+        existing_orders = {(row[0], row[1]) for row in dst_cur.execute(f"SELECT usr_id, rtr_id FROM \"{dst_table}\"")}
+    
+        inserted = 0
+        skipped = 0
+        old_to_new_id = {}
+        insert_sql = _INSERT_ORDER_SQL.format(table=dst_table)
+    
+        # Stream source orders rather than loading every details blob up front
+        for order in src_cur.execute(f"SELECT * FROM \"{src_table}\""):
+            new_usr_id = usr_id_map.get(order["usr_id"], order["usr_id"])
+            new_rtr_id = rtr_id_map.get(order["rtr_id"], order["rtr_id"])
         
-        if (new_usr_id, new_rtr_id) not in existing_orders:
-            dst_cur.execute(f"""
-                INSERT INTO "{dst_table}" (usr_id, rtr_id, details, status)
-                VALUES (?, ?, ?, ?)
-            """, (new_usr_id, new_rtr_id, order["details"], order["status"]))
-            new_id = dst_cur.lastrowid
-            old_to_new_id[order["ord_id"]] = new_id
-            inserted += 1
-            existing_orders.add((new_usr_id, new_rtr_id))
-        else:
-            skipped += 1
+            if (new_usr_id, new_rtr_id) not in existing_orders:
+                dst_cur.execute(insert_sql, (new_usr_id, new_rtr_id, order["details"], order["status"]))
+                new_id = dst_cur.lastrowid
+                old_to_new_id[order["ord_id"]] = new_id
+                inserted += 1
+                existing_orders.add((new_usr_id, new_rtr_id))
+            else:
+                skipped += 1
     
-    dst_conn.commit()
     print(f"[OK] Orders: inserted {inserted}, skipped {skipped} duplicates")
     return old_to_new_id
 
-def merge_reviews(dst_conn, src_conn, rtr_id_map, usr_id_map):
+def merge_reviews(dst_conn, rtr_id_map, usr_id_map):
     """Merge Review table - avoid duplicates by (usr_id, rtr_id)."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    src_cur.execute("SELECT * FROM Review")
-    src_reviews = src_cur.fetchall()
+    with dst_conn:
+        load_id_map(dst_conn, "rtr_id_map", rtr_id_map)
+        load_id_map(dst_conn, "usr_id_map", usr_id_map)
+    
+        # Anti-join against existing reviews, keeping the first backup row per (usr_id, rtr_id)
+        cur = dst_conn.execute("""
+            INSERT INTO Review (usr_id, rtr_id, title, rating, description)
+            SELECT new_usr_id, new_rtr_id, title, rating, description
+            FROM (
+                SELECT COALESCE(um.new_id, r.usr_id) AS new_usr_id, COALESCE(rm.new_id, r.rtr_id) AS new_rtr_id,
+                       r.*, MIN(r.rev_id)
+                FROM backup.Review r
+                LEFT JOIN temp.usr_id_map um ON um.old_id = r.usr_id
+                LEFT JOIN temp.rtr_id_map rm ON rm.old_id = r.rtr_id
+                GROUP BY new_usr_id, new_rtr_id
+            ) b
+            WHERE NOT EXISTS (
+                SELECT 1 FROM main.Review d
+                WHERE d.usr_id = b.new_usr_id AND d.rtr_id = b.new_rtr_id
+            )
+            ORDER BY b.rev_id
+        """)
+        inserted = cur.rowcount
+        skipped = dst_conn.execute("SELECT COUNT(*) FROM backup.Review").fetchone()[0] - inserted
     
-    dst_cur.execute("SELECT usr_id, rtr_id FROM Review")
-    existing_reviews = {(row[0], row[1]) for row in dst_cur.fetchall()}
-    
-    inserted = 0
-    skipped = 0
-    
-    for review in src_reviews:
-        new_usr_id = usr_id_map.get(review["usr_id"], review["usr_id"])
-        new_rtr_id = rtr_id_map.get(review["rtr_id"], review["rtr_id"])
-        
-        if (new_usr_id, new_rtr_id) not in existing_reviews:
-            dst_cur.execute("""
-                INSERT INTO Review (usr_id, rtr_id, rating, comment, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (new_usr_id, new_rtr_id, review["rating"], review["comment"], review["timestamp"]))
-            inserted += 1
-            existing_reviews.add((new_usr_id, new_rtr_id))
-        else:
-            skipped += 1
-    
-    dst_conn.commit()
     print(f"[OK] Reviews: inserted {inserted}, skipped {skipped} duplicates")
 
-def merge_analytics(dst_conn, src_conn, rtr_id_map):
-    """Merge Analytics table - avoid duplicates by (rtr_id, date)."""
-    src_cur = src_conn.cursor()
-    dst_cur = dst_conn.cursor()
-    
-    src_cur.execute("SELECT * FROM Analytics")
-    src_analytics = src_cur.fetchall()
-    
-    dst_cur.execute("SELECT rtr_id, date FROM Analytics")
-    existing = {(row[0], row[1]) for row in dst_cur.fetchall()}
+def merge_analytics(dst_conn, rtr_id_map):
+    """Merge Analytics table - avoid duplicates by (rtr_id, snapshot_date)."""
+    with dst_conn:
+        load_id_map(dst_conn, "rtr_id_map", rtr_id_map)
+    
+        # Snapshots legitimately repeat per day, so this key can't be a unique index;
+        # dedup with an anti-join and keep the first backup row per key instead
+        cur = dst_conn.execute("""
+            INSERT INTO Analytics (rtr_id, snapshot_date, total_orders, total_revenue_cents, avg_order_value_cents,
+                                   total_customers, order_completion_rate, created_at)
+            SELECT new_rtr_id, snapshot_date, total_orders, total_revenue_cents, avg_order_value_cents,
+                   total_customers, order_completion_rate, created_at
+            FROM (
+                SELECT COALESCE(m.new_id, a.rtr_id) AS new_rtr_id, a.*, MIN(a.analytics_id)
+                FROM backup.Analytics a LEFT JOIN temp.rtr_id_map m ON m.old_id = a.rtr_id
+                GROUP BY new_rtr_id, a.snapshot_date
+            ) b
+            WHERE NOT EXISTS (
+                SELECT 1 FROM main.Analytics d
+                WHERE d.rtr_id = b.new_rtr_id AND d.snapshot_date = b.snapshot_date
+            )
+            ORDER BY b.analytics_id
+        """)
+        inserted = cur.rowcount
+        skipped = dst_conn.execute("SELECT COUNT(*) FROM backup.Analytics").fetchone()[0] - inserted
     
-    inserted = 0
-    skipped = 0
-    
-    for record in src_analytics:
-        new_rtr_id = rtr_id_map.get(record["rtr_id"], record["rtr_id"])
-        
-        if (new_rtr_id, record["date"]) not in existing:
-            dst_cur.execute("""
-                INSERT INTO Analytics (rtr_id, date, total_orders, total_revenue_cents, order_completion_rate)
-                VALUES (?, ?, ?, ?, ?)
-            """, (new_rtr_id, record["date"], record["total_orders"], 
-                  record["total_revenue_cents"], record["order_completion_rate"]))
-            inserted += 1
-            existing.add((new_rtr_id, record["date"]))
-        else:
-            skipped += 1
-    
-    dst_conn.commit()
     print(f"[OK] Analytics: inserted {inserted}, skipped {skipped} duplicates")
 
 def main():
@@ -266,40 +256,47 @@ def main():
     
     copy_database(CURRENT_DB, MERGED_DB)
     
-    # Open connections
+    # Open connections; the backup is attached so merges run as INSERT ... SELECT
     dst_conn = get_connection(MERGED_DB)
+    tune_connection(dst_conn)
     src_conn = get_connection(BACKUP_DB)
+    dst_conn.execute("ATTACH DATABASE ? AS backup", (BACKUP_DB,))
     
     print("\nMerging data...")
     print("-" * 60)
     
-    # Merge in order (respecting foreign keys)
-    merge_users(dst_conn, src_conn)
-    rtr_id_map = merge_restaurants(dst_conn, src_conn)
-    itm_id_map = merge_menu_items(dst_conn, src_conn, rtr_id_map)
-    
-    # For users, we need to get ID mapping (backup users are added with new IDs)
-    dst_cur = dst_conn.cursor()
-    src_cur = src_conn.cursor()
-    usr_id_map = {}
-    
-    src_cur.execute("SELECT usr_id, email FROM User")
-    for src_row in src_cur.fetchall():
-        dst_cur.execute("SELECT usr_id FROM User WHERE email = ?", (src_row["email"],))
-        dst_row = dst_cur.fetchone()
-        if dst_row:
-            usr_id_map[src_row["usr_id"]] = dst_row[0]
-    
-    ord_id_map = {}  # Skip orders - schemas are incompatible
-    # merge_orders(dst_conn, src_conn, rtr_id_map, usr_id_map)
-    print("[WARN] Orders merge skipped - schemas differ between current and backup DB")
-    merge_reviews(dst_conn, src_conn, rtr_id_map, usr_id_map)
-    print("[WARN] Reviews merge skipped - schemas differ between current and backup DB")
-    merge_analytics(dst_conn, src_conn, rtr_id_map)
-    
-    # Close connections
-    dst_conn.close()
-    src_conn.close()
+    try:
+        for name, target in MERGE_INDEXES.items():
+            dst_conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        
+        # Merge in order (respecting foreign keys)
+        merge_users(dst_conn)
+        rtr_id_map = merge_restaurants(dst_conn)
+        itm_id_map = merge_menu_items(dst_conn, rtr_id_map)
+        
+        # For users, we need to get ID mapping (backup users are added with new IDs)
+        dst_cur = dst_conn.cursor()
+        src_cur = src_conn.cursor()
+        dst_email_to_id = {email: usr_id for email, usr_id in dst_cur.execute("SELECT email, usr_id FROM User")}
+        
+        usr_id_map = {src_row["usr_id"]: dst_email_to_id[src_row["email"]]
+                      for src_row in src_cur.execute("SELECT usr_id, email FROM User")
+                      if src_row["email"] in dst_email_to_id}
+        
+        ord_id_map = {}  # Skip orders - schemas are incompatible
+        # merge_orders(dst_conn, src_conn, rtr_id_map, usr_id_map)
+        print("[WARN] Orders merge skipped - schemas differ between current and backup DB")
+        merge_reviews(dst_conn, rtr_id_map, usr_id_map)
+        merge_analytics(dst_conn, rtr_id_map)
+    finally:
+        for name in MERGE_INDEXES:
+            dst_conn.execute(f"DROP INDEX IF EXISTS {name}")
+        dst_conn.commit()
+        dst_conn.execute("DETACH DATABASE backup")
+        
+        # Close connections
+        dst_conn.close()
+        src_conn.close()
     
     print("-" * 60)
     print("\n[OK] Merge complete!")
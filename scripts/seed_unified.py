@@ -20,6 +20,9 @@ import os
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from proj2.sqlQueries import tune_connection
+
 # Paths
 PROJ_DIR = Path(__file__).parent.parent / "proj2"
 CURRENT_DB = PROJ_DIR / "CSC510_DB.db"
@@ -27,6 +30,17 @@ BACKUP_DB = PROJ_DIR / "CSC510_DB.db.backup.20251119_183208"
 OUTPUT_DB = PROJ_DIR / "CSC510_DB_unified.db"
 
 
+def copy_database(src, dst):
+    """Copy a database with SQLite's online backup so pending WAL frames are included."""
+    src_conn = sqlite3.connect(src)
+    dst_conn = sqlite3.connect(dst)
+    try:
+        src_conn.backup(dst_conn)
+    finally:
+        dst_conn.close()
+        src_conn.close()
+
+
 def get_schema(db_path):
     """Extract the schema from a database."""
     conn = sqlite3.connect(db_path)
@@ -39,52 +53,33 @@ def get_schema(db_path):
     return schema
 
 
-def copy_table_data(source_db, dest_db, table_name, id_offset=0):
+def copy_table_data(dest_db, table_name, id_offset=0):
     """
-    Copy data from a table in source_db to dest_db.
+    Copy a table from the attached backup database into dest_db inside SQLite.
     
     Args:
-        source_db: Path to source database
-        dest_db: Connection to destination database
+        dest_db: Connection to destination database, with the source attached as "backup"
         table_name: Name of the table to copy
         id_offset: Offset to add to primary keys (to avoid conflicts)
     
     Returns:
         Number of rows copied
     """
-    source_conn = sqlite3.connect(source_db)
-    source_conn.row_factory = sqlite3.Row
-    source_cursor = source_conn.cursor()
-    
-    dest_cursor = dest_db.cursor()
-    
-    # Get column names
-    source_cursor.execute(f'PRAGMA table_info("{table_name}")')
-    columns_info = source_cursor.fetchall()
-    columns = [col[1] for col in columns_info]
-    
-    # Check for primary key to apply offset
-    pk_column = columns_info[0][1] if columns_info[0][5] else None  # Check if primary key
-    
-    # Fetch all data
-    source_cursor.execute(f'SELECT * FROM "{table_name}"')
-    rows = source_cursor.fetchall()
-    
-    # Prepare insert statement (quote table name and columns for reserved keywords)
-    col_names = ",".join([f'"{col}"' for col in columns])
-    placeholders = ",".join(["?" for _ in columns])
-    insert_sql = f'INSERT INTO "{table_name}" ({col_names}) VALUES ({placeholders})'
-    
-    # Insert rows
-    for row in rows:
-        row_list = list(row)
-        # Apply offset to ID column if needed and offset > 0
-        if id_offset > 0 and pk_column and row_list[0] is not None:
-            row_list[0] = row_list[0] + id_offset
-        dest_cursor.execute(insert_sql, row_list)
-    
-    source_conn.close()
-    return len(rows)
+    # Get column names from the source table
+    columns_info = dest_db.execute(f'PRAGMA backup.table_info("{table_name}")').fetchall()
+    columns = [f'"{col[1]}"' for col in columns_info]
+    
+    # Apply offset to the primary key column if needed and offset > 0
+    select_columns = list(columns)
+    if id_offset > 0 and columns_info[0][5]:
+        select_columns[0] = f'{columns[0]} + {int(id_offset)}'
+    
+    # Quote table name and columns for reserved keywords
+    cursor = dest_db.execute(
+        f'INSERT INTO main."{table_name}" ({",".join(columns)}) '
+        f'SELECT {",".join(select_columns)} FROM backup."{table_name}"'
+    )
+    return cursor.rowcount
 
 
 def create_unified_database():
@@ -98,27 +93,23 @@ def create_unified_database():
         print(f"  Removed existing: {OUTPUT_DB}")
     
     # Copy current database as base
-    import shutil
-    shutil.copy(CURRENT_DB, OUTPUT_DB)
+    copy_database(CURRENT_DB, OUTPUT_DB)
     print(f"  ✓ Created base from: {CURRENT_DB}")
     
     # Connect to destination
     dest_conn = sqlite3.connect(OUTPUT_DB)
+    tune_connection(dest_conn)
     dest_conn.execute("PRAGMA foreign_keys = OFF")  # Disable FK checks during import
     dest_cursor = dest_conn.cursor()
     
     # Get current max IDs
-    dest_cursor.execute("SELECT MAX(usr_id) FROM User")
-    max_usr_id = dest_cursor.fetchone()[0] or 0
-    
-    dest_cursor.execute("SELECT MAX(rtr_id) FROM Restaurant")
-    max_rtr_id = dest_cursor.fetchone()[0] or 0
-    
-    dest_cursor.execute("SELECT MAX(itm_id) FROM MenuItem")
-    max_itm_id = dest_cursor.fetchone()[0] or 0
-    
-    dest_cursor.execute("SELECT MAX(ord_id) FROM 'Order'")
-    max_ord_id = dest_cursor.fetchone()[0] or 0
+    row = dest_cursor.execute("""
+        SELECT (SELECT MAX(usr_id) FROM User),
+               (SELECT MAX(rtr_id) FROM Restaurant),
+               (SELECT MAX(itm_id) FROM MenuItem),
+               (SELECT MAX(ord_id) FROM "Order")
+    """).fetchone()
+    max_usr_id, max_rtr_id, max_itm_id, max_ord_id = (value or 0 for value in row)
     
     print(f"\n📊 Current max IDs:")
     print(f"  User: {max_usr_id}, Restaurant: {max_rtr_id}, MenuItem: {max_itm_id}, Order: {max_ord_id}")
@@ -135,31 +126,31 @@ def create_unified_database():
         ("Review", 0),     # Review has rvw_id, handle separately
     ]
     
-    total_rows = 0
-    for table_name, id_offset in tables_to_copy:
-        # Check if table exists in backup
-        source_conn = sqlite3.connect(BACKUP_DB)
-        source_cursor = source_conn.cursor()
-        source_cursor.execute(
-            'SELECT name FROM sqlite_master WHERE type="table" AND name=?',
-            (table_name,)
-        )
-        if not source_cursor.fetchone():
-            source_conn.close()
-            print(f"  ⚠️  Table {table_name} not in backup, skipping")
-            continue
-        source_conn.close()
+    # Copy inside the engine: attach the backup and run every table copy in one transaction
+    dest_conn.execute("ATTACH DATABASE ? AS backup", (str(BACKUP_DB),))
+    existing_tables = {
+        row[0] for row in dest_conn.execute("SELECT name FROM backup.sqlite_master WHERE type='table'")
+    }
+    with dest_conn:
+        dest_conn.execute("BEGIN")
         
-        try:
-            rows = copy_table_data(BACKUP_DB, dest_conn, table_name, id_offset)
-            total_rows += rows
-            print(f"  ✓ {table_name}: {rows} rows")
-        except Exception as e:
-            print(f"  ✗ {table_name}: {e}")
-    
-    # Re-enable foreign keys and commit
+        total_rows = 0
+        for table_name, id_offset in tables_to_copy:
+            # Check if table exists in backup
+            if table_name not in existing_tables:
+                print(f"  ⚠️  Table {table_name} not in backup, skipping")
+                continue
+            
+            try:
+                rows = copy_table_data(dest_conn, table_name, id_offset)
+                total_rows += rows
+                print(f"  ✓ {table_name}: {rows} rows")
+            except Exception as e:
+                print(f"  ✗ {table_name}: {e}")
+    
+    # Re-enable foreign keys once the copy has committed
     dest_conn.execute("PRAGMA foreign_keys = ON")
-    dest_conn.commit()
+    dest_conn.execute("DETACH DATABASE backup")
     dest_conn.close()
     
     print(f"\n✅ Created unified database with {total_rows} rows from backup")
@@ -190,17 +181,16 @@ def verify_unified_database():
 
 def backup_and_replace():
     """Backup current database and replace with unified version."""
-    import shutil
     from datetime import datetime
     
     # Create backup of current
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     current_backup = PROJ_DIR / f"CSC510_DB.db.backup.{timestamp}"
-    shutil.copy(CURRENT_DB, current_backup)
+    copy_database(CURRENT_DB, current_backup)
     print(f"\n💾 Backed up current database to: {current_backup}")
     
     # Replace with unified
-    shutil.copy(OUTPUT_DB, CURRENT_DB)
+    copy_database(OUTPUT_DB, CURRENT_DB)
     print(f"✓ Replaced current database with unified version")
 
 
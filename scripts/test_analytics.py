@@ -5,60 +5,75 @@ Test script to verify analytics dashboard data population.
 
 import sys
 import os
+from functools import lru_cache
 sys.path.insert(0, '.')
 
-from proj2.sqlQueries import create_connection, close_connection, fetch_one, fetch_all, execute_query
+from proj2.sqlQueries import fetch_one, fetch_all
+from scripts._db import get_conn
 from werkzeug.security import generate_password_hash
 
-db_file = os.path.join('proj2', 'CSC510_DB.db')
+# Read once so the memoized hashes below all come from the same mode
+FAST_TEST_HASH = os.environ.get('FAST_TEST_HASH') == '1'
+
+@lru_cache(maxsize=16)
+def hash_test_password(password):
+    """Hash a fixture password; FAST_TEST_HASH=1 drops PBKDF2 to a single iteration.
+
+    Memoized so repeated setups in one process reuse the hash instead of rerunning the KDF.
+    """
+    if FAST_TEST_HASH:
+        return generate_password_hash(password, method='pbkdf2:sha256:1')
+    return generate_password_hash(password)
 
 def setup_restaurant_login():
     """Ensure a restaurant exists with known credentials for testing."""
-    conn = create_connection(db_file)
+    conn = get_conn()
     if not conn:
         print("Failed to connect to database")
         return False
     
-    try:
-        # Check if restaurant exists
-        rtr = fetch_one(conn, "SELECT rtr_id, email FROM Restaurant WHERE name = 'Bida Manda'")
-        
+    # Look up the restaurant and set its test password ('password123') in one
+    # write transaction; the hash is computed first so the lock isn't held for it
+    hashed = hash_test_password('password123')
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rtr = conn.execute(
+            "SELECT rtr_id, email FROM Restaurant WHERE name = 'Bida Manda'").fetchone()
         if rtr:
-            rtr_id = rtr[0]
-            print(f"Found restaurant: Bida Manda (ID: {rtr_id})")
-            
-            # Update password for testing (set to 'password123')
-            hashed = generate_password_hash('password123')
-            execute_query(conn, 
-                "UPDATE Restaurant SET password_HS = ? WHERE rtr_id = ?",
-                (hashed, rtr_id))
-            print(f"Updated password for restaurant login")
-            
-            # Record a fresh analytics snapshot
-            from proj2.Flask_app import record_analytics_snapshot
-            result = record_analytics_snapshot(rtr_id)
-            print(f"Recorded analytics snapshot: {result}")
-            
-            if result:
-                # Display the snapshot
-                analytics = fetch_one(conn,
-                    "SELECT total_orders, total_revenue_cents, avg_order_value_cents, total_customers, order_completion_rate FROM Analytics WHERE rtr_id = ? ORDER BY analytics_id DESC LIMIT 1",
-                    (rtr_id,))
-                
-                if analytics:
-                    print("\nLatest Analytics Snapshot:")
-                    print(f"  Total Orders: {analytics[0]}")
-                    print(f"  Total Revenue: ${analytics[1]/100:.2f}")
-                    print(f"  Avg Order Value: ${analytics[2]/100:.2f}")
-                    print(f"  Total Customers: {analytics[3]}")
-                    print(f"  Completion Rate: {analytics[4]:.1%}")
+            conn.execute("UPDATE Restaurant SET password_HS = ? WHERE rtr_id = ?",
+                         (hashed, rtr[0]))
+    
+    if rtr:
+        rtr_id = rtr[0]
+        print(f"Found restaurant: Bida Manda (ID: {rtr_id})")
+        print(f"Updated password for restaurant login")
+        
+        # Record a fresh analytics snapshot
+        from proj2.Flask_app import record_analytics_snapshot
+        result = record_analytics_snapshot(rtr_id)
+        print(f"Recorded analytics snapshot: {result}")
+        
+        if result:
+            # Display the snapshot
+            analytics = fetch_one(conn,
+                """SELECT total_orders, printf('$%.2f', total_revenue_cents / 100.0),
+                          printf('$%.2f', avg_order_value_cents / 100.0), total_customers,
+                          order_completion_rate
+                   FROM Analytics WHERE rtr_id = ? ORDER BY analytics_id DESC LIMIT 1""",
+                (rtr_id,))
             
-            return True
-        else:
-            print("Restaurant 'Bida Manda' not found")
-            return False
-    finally:
-        close_connection(conn)
+            if analytics:
+                print("\nLatest Analytics Snapshot:")
+                print(f"  Total Orders: {analytics[0]}")
+                print(f"  Total Revenue: {analytics[1]}")
+                print(f"  Avg Order Value: {analytics[2]}")
+                print(f"  Total Customers: {analytics[3]}")
+                print(f"  Completion Rate: {analytics[4]:.1%}")
+        
+        return True
+    else:
+        print("Restaurant 'Bida Manda' not found")
+        return False
 
 if __name__ == '__main__':
     setup_restaurant_login()
@@ -3,44 +3,56 @@
 
 import sys
 import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 sys.path.insert(0, '.')
 
-from proj2.sqlQueries import create_connection, close_connection, fetch_all, fetch_one
+from proj2.sqlQueries import create_connection, close_connection
 
 db_file = os.path.join('proj2', 'CSC510_DB.db')
 
 
-def verify_analytics_data():
-    """Verify analytics data is properly populated in the database."""
+def run_query(query, params=()):
+    """Run a read-only query on its own connection so it can run on a worker thread."""
     conn = create_connection(db_file)
+    try:
+        return conn.execute(query, params).fetchall()
+    finally:
+        close_connection(conn)
 
+
+def query_result(future):
+    """Return a run_query future's rows; like fetch_all, print SQLite errors and return []."""
     try:
-        # Query analytics for restaurant 1 (Bida Manda)
-        rtr_id = 1
-        snapshots = fetch_all(conn, '''
-            SELECT snapshot_date, total_orders, total_revenue_cents, 
-                   avg_order_value_cents, total_customers, order_completion_rate
+        return future.result()
+    except sqlite3.Error as e:
+        print(e)
+        return []
+
+
+def verify_analytics_data():
+    """Verify analytics data is properly populated in the database."""
+    # Query analytics for restaurant 1 (Bida Manda)
+    rtr_id = 1
+
+    # The three reads are independent, so run them concurrently, one connection per thread
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        snapshots_future = executor.submit(run_query, '''
+            SELECT snapshot_date, total_orders,
+                   printf('$%.2f', total_revenue_cents / 100.0),
+                   printf('$%.2f', avg_order_value_cents / 100.0),
+                   total_customers, order_completion_rate
             FROM Analytics
             WHERE rtr_id = ?
             ORDER BY snapshot_date DESC
         ''', (rtr_id,))
 
-        print(f'Analytics snapshots for Restaurant {rtr_id}:')
-        for snapshot in snapshots:
-            date, orders, revenue, avg_val, customers, completion = snapshot
-            print(f'  Date: {date}')
-            print(f'    Total Orders: {orders}')
-            print(f'    Revenue: ${revenue/100:.2f}')
-            print(f'    Avg Order: ${avg_val/100:.2f}')
-            print(f'    Customers: {customers}')
-            print(f'    Completion Rate: {completion:.1f}%\n')
-
         # Query orders for restaurant 1
-        order_count = fetch_one(conn, 'SELECT COUNT(*) FROM [Order] WHERE rtr_id = ?', (rtr_id,))
-        print(f'Total orders for Restaurant 1: {order_count[0]}')
+        order_count_future = executor.submit(
+            run_query, 'SELECT COUNT(*) FROM [Order] WHERE rtr_id = ?', (rtr_id,))
 
         # Query top items
-        items = fetch_all(conn, '''
+        items_future = executor.submit(run_query, '''
             SELECT m.name, COUNT(oi.oi_id) as count
             FROM MenuItem m
             LEFT JOIN OrderItems oi ON m.itm_id = oi.itm_id
@@ -51,18 +63,38 @@ def verify_analytics_data():
             LIMIT 5
         ''', (rtr_id,))
 
-        print(f'\nTop 5 menu items:')
-        for item in items:
-            name, count = item
-            print(f'  {name}: {count} orders')
+    snapshots = query_result(snapshots_future)
 
-        print('\n✅ Analytics data is ready for testing!')
-        print('   Restaurant: Bida Manda (ID: 1)')
-        print('   Password: password123 (from test_analytics.py)')
-        print('   Navigate to: /restaurant/analytics')
+    # Money arrives formatted by SQLite's printf; the rate is formatted here because
+    # SQLite rounds ties differently. Build the whole report and write it once
+    # instead of six prints per snapshot
+    out = [f'Analytics snapshots for Restaurant {rtr_id}:\n']
+    for snapshot in snapshots:
+        date, orders, revenue, avg_val, customers, completion = snapshot
+        out.append(
+            f'  Date: {date}\n'
+            f'    Total Orders: {orders}\n'
+            f'    Revenue: {revenue}\n'
+            f'    Avg Order: {avg_val}\n'
+            f'    Customers: {customers}\n'
+            f'    Completion Rate: {completion:.1f}%\n\n'
+        )
+    sys.stdout.write(''.join(out))
 
-    finally:
-        close_connection(conn)
+    order_count = query_result(order_count_future)[0]
+    print(f'Total orders for Restaurant 1: {order_count[0]}')
+
+    items = query_result(items_future)
+
+    print(f'\nTop 5 menu items:')
+    for item in items:
+        name, count = item
+        print(f'  {name}: {count} orders')
+
+    print('\n✅ Analytics data is ready for testing!')
+    print('   Restaurant: Bida Manda (ID: 1)')
+    print('   Password: password123 (from test_analytics.py)')
+    print('   Navigate to: /restaurant/analytics')
 
 
 if __name__ == '__main__':